@@ -11,16 +11,23 @@ import argparse
 import asyncio
 import datetime as dt
 import hashlib
+import importlib.util
 import json
+import os
 from pathlib import Path
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 import httpx
 import uvicorn
 from starlette.applications import Starlette
 from starlette.background import BackgroundTask
 from starlette.requests import Request
-from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from starlette.routing import Route
 
 
@@ -37,29 +44,53 @@ HOP_BY_HOP_HEADERS = {
     "content-length",
 }
 
+# Streamed request bodies keep the client's Content-Length so httpx forwards
+# them with the same framing instead of switching to chunked encoding.
+REQUEST_HOP_BY_HOP_BYTES = frozenset(
+    h.encode("latin-1") for h in HOP_BY_HOP_HEADERS if h != "content-length"
+)
+
+# Request bodies up to this size are kept for the JSON-RPC method in the log.
+LOG_BODY_LIMIT = 64 * 1024
+
 
 def filter_headers(headers: Iterable[tuple[str, str]]) -> dict[str, str]:
-    return {k: v for k, v in headers if k.lower() not in HOP_BY_HOP_HEADERS}
+    """Drop hop-by-hop headers. Header names must already be lowercase."""
+    return {k: v for k, v in headers if k not in HOP_BY_HOP_HEADERS}
+
+
+def filter_raw_headers(
+    headers: Iterable[tuple[bytes, bytes]],
+) -> list[tuple[bytes, bytes]]:
+    """
+    Drop hop-by-hop headers from raw (lowercase, per ASGI) request header pairs.
+    Content-Length is kept because the body is streamed through unchanged.
+    """
+    return [(k, v) for k, v in headers if k not in REQUEST_HOP_BY_HOP_BYTES]
 
 
-def apply_api_key_fallback(headers: dict[str, str]) -> dict[str, str]:
+def apply_api_key_fallback(
+    headers: list[tuple[bytes, bytes]],
+) -> list[tuple[bytes, bytes]]:
     """
     Allow clients that send Authorization: Bearer <token> by forwarding that
     token as X-API-Key when X-API-Key is not already present.
     """
-    has_api_key = any(k.lower() == "x-api-key" for k in headers)
-    if has_api_key:
-        return headers
-
-    auth_value = next((v for k, v in headers.items() if k.lower() == "authorization"), "")
-    if not auth_value.lower().startswith("bearer "):
+    auth_value = b""
+    for k, v in headers:
+        if k == b"x-api-key":
+            return headers
+        if k == b"authorization":
+            auth_value = v
+
+    if auth_value[:7].lower() != b"bearer ":
         return headers
 
     token = auth_value[7:].strip()
     if not token:
         return headers
 
-    headers["X-API-Key"] = token
+    headers.append((b"x-api-key", token))
     return headers
 
 
@@ -92,11 +123,14 @@ def extract_jsonrpc_method(body: bytes) -> str | None:
 
 def log_gateway_request(
     request: Request,
-    req_headers: dict[str, str],
+    req_headers: list[tuple[bytes, bytes]],
     body: bytes,
     upstream_status: int,
 ) -> None:
-    sanitized_headers = {k: sanitize_header_value(k, v) for k, v in req_headers.items()}
+    sanitized_headers = {}
+    for k, v in req_headers:
+        key = k.decode("latin-1")
+        sanitized_headers[key] = sanitize_header_value(key, v.decode("latin-1"))
     client_ip = request.client.host if request.client else "unknown"
     event = {
         "event": "gateway_request",
@@ -112,39 +146,97 @@ def log_gateway_request(
     print(json.dumps(event, ensure_ascii=True), flush=True)
 
 
-def load_deploy_info(path: Path) -> dict:
-    if not path.exists():
-        return {"status": "unknown", "message": "deploy metadata not found"}
+_deploy_cache: tuple[tuple[Path, int], bytes] | None = None
+
+
+def _deploy_info_body(path: Path) -> bytes:
+    """
+    Return the deploy metadata rendered as a JSON body, re-reading the file
+    only when its mtime changes.
+    """
+    global _deploy_cache
+    try:
+        # One open() serves both the mtime check and the read, so a cache hit
+        # costs a single fstat and the file cannot vanish between the two.
+        with path.open("rb") as fh:
+            key = (path, os.fstat(fh.fileno()).st_mtime_ns)
+            if _deploy_cache is not None and _deploy_cache[0] == key:
+                return _deploy_cache[1]
+            data = fh.read()
+    except FileNotFoundError:
+        return JSONResponse(
+            {"status": "unknown", "message": "deploy metadata not found"}
+        ).body
+    except OSError as exc:
+        return JSONResponse(
+            {"status": "error", "message": f"failed reading deploy metadata: {exc}"}
+        ).body
+
     try:
-        return json.loads(path.read_text())
+        body = JSONResponse(json.loads(data)).body
     except Exception as exc:
-        return {"status": "error", "message": f"failed reading deploy metadata: {exc}"}
+        return JSONResponse(
+            {"status": "error", "message": f"failed reading deploy metadata: {exc}"}
+        ).body
+
+    _deploy_cache = (key, body)
+    return body
 
 
 def create_app(target_base: str, deploy_info_path: Path) -> Starlette:
-    client = httpx.AsyncClient(timeout=None, follow_redirects=False)
+    # Keep loopback connections to mcp-proxy pooled so short requests do not
+    # pay for a fresh TCP handshake each time.
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(None, connect=5.0),
+        follow_redirects=False,
+        limits=httpx.Limits(
+            max_connections=1024,
+            max_keepalive_connections=512,
+            keepalive_expiry=60.0,
+        ),
+    )
 
     async def status_endpoint(_: Request) -> Response:
-        return JSONResponse(load_deploy_info(deploy_info_path))
+        body = _deploy_info_body(deploy_info_path)
+        return Response(body, media_type="application/json")
 
     async def proxy(request: Request) -> Response:
         target_url = f"{target_base}{request.url.path}"
         if request.url.query:
             target_url = f"{target_url}?{request.url.query}"
 
-        req_headers = filter_headers(request.headers.items())
+        req_headers = filter_raw_headers(request.scope["headers"])
         req_headers = apply_api_key_fallback(req_headers)
-        body = await request.body()
+
+        # Only the client's framing headers say whether a body follows.
+        has_body = False
+        for k, v in request.scope["headers"]:
+            if k == b"content-length":
+                has_body = v.strip() != b"0"
+                break
+            if k == b"transfer-encoding":
+                has_body = True
+        logged_body = bytearray()
+
+        async def body_stream() -> AsyncIterator[bytes]:
+            # Forward chunks as they arrive, keeping a bounded copy for the log.
+            async for chunk in request.stream():
+                if len(logged_body) <= LOG_BODY_LIMIT:
+                    logged_body.extend(chunk)
+                yield chunk
 
         outbound = client.build_request(
             request.method,
             target_url,
             headers=req_headers,
-            content=body if body else None,
+            content=body_stream() if has_body else None,
         )
         upstream = await client.send(outbound, stream=True)
+        body = bytes(logged_body) if len(logged_body) <= LOG_BODY_LIMIT else b""
         log_gateway_request(request, req_headers, body, upstream.status_code)
 
+        # items() yields lowercased names and comma-joins repeated headers, so
+        # the dict built by filter_headers keeps every value.
         resp_headers = filter_headers(upstream.headers.items())
         return StreamingResponse(
             upstream.aiter_raw(),
@@ -156,6 +248,16 @@ def create_app(target_base: str, deploy_info_path: Path) -> Starlette:
     async def health(_: Request) -> Response:
         return PlainTextResponse("ok")
 
+    async def startup() -> None:
+        # Open the first pooled connection before traffic arrives. The backend
+        # may still be starting (or wedged), so bound the wait: uvicorn only
+        # binds the socket once startup returns, and /healthz and /status must
+        # come up regardless.
+        try:
+            await client.head(f"{target_base}/healthz", timeout=2.0)
+        except httpx.HTTPError:
+            pass
+
     async def shutdown() -> None:
         await client.aclose()
 
@@ -171,6 +273,10 @@ def create_app(target_base: str, deploy_info_path: Path) -> Starlette:
         ]
     )
 
+    @app.on_event("startup")
+    async def _on_startup() -> None:
+        await startup()
+
     @app.on_event("shutdown")
     async def _on_shutdown() -> None:
         await shutdown()
@@ -186,9 +292,31 @@ def main() -> None:
     parser.add_argument("--deploy-info", default=".runtime/deployed.json")
     args = parser.parse_args()
 
+    # Prefer the C implementations from uvicorn[standard]; fall back to
+    # uvicorn's own selection when they are not installed.
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "auto"
+    http = "httptools" if importlib.util.find_spec("httptools") else "auto"
+
     deploy_info_path = Path(args.deploy_info)
     app = create_app(args.target.rstrip("/"), deploy_info_path)
-    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level="info",
+        loop=loop,
+        http=http,
+        # MCP traffic is SSE + POST; nothing is ever upgraded to a WebSocket.
+        ws="none",
+        lifespan="on",
+        # Every open SSE stream counts here; past the cap uvicorn answers 503.
+        limit_concurrency=1024,
+        # log_gateway_request already emits one structured line per request.
+        access_log=False,
+        proxy_headers=False,
+        server_header=False,
+        date_header=False,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,319 @@
+"""
+Tests for the HTTP gateway in scripts/mcp_gateway.py
+"""
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import mcp_gateway
+from mcp_gateway import apply_api_key_fallback, filter_raw_headers
+
+
+class TestFilterRawHeaders(unittest.TestCase):
+    """Tests for filter_raw_headers"""
+
+    def test_drops_hop_by_hop_headers(self):
+        """Test that hop-by-hop headers are removed"""
+        # Setup
+        headers = [
+            (b"host", b"example.com"),
+            (b"connection", b"keep-alive"),
+            (b"transfer-encoding", b"chunked"),
+            (b"accept", b"*/*"),
+        ]
+
+        # Run function
+        result = filter_raw_headers(headers)
+
+        # Check results
+        self.assertEqual(result, [(b"accept", b"*/*")])
+
+    def test_keeps_content_length(self):
+        """Test that Content-Length survives so streamed bodies keep their framing"""
+        # Setup
+        headers = [(b"content-length", b"12"), (b"content-type", b"application/json")]
+
+        # Run function
+        result = filter_raw_headers(headers)
+
+        # Check results
+        self.assertEqual(result, headers)
+
+    def test_keeps_duplicate_headers(self):
+        """Test that repeated end-to-end headers are all forwarded"""
+        # Setup
+        headers = [(b"cookie", b"a=1"), (b"cookie", b"b=2")]
+
+        # Run function
+        result = filter_raw_headers(headers)
+
+        # Check results
+        self.assertEqual(result, headers)
+
+
+class TestApplyApiKeyFallback(unittest.TestCase):
+    """Tests for apply_api_key_fallback"""
+
+    def test_bearer_token_added_as_api_key(self):
+        """Test that a bearer token is forwarded as X-API-Key"""
+        # Setup
+        headers = [(b"authorization", b"Bearer secret")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertEqual(
+            result,
+            [(b"authorization", b"Bearer secret"), (b"x-api-key", b"secret")],
+        )
+
+    def test_bearer_scheme_is_case_insensitive(self):
+        """Test that a lowercase bearer scheme is accepted"""
+        # Setup
+        headers = [(b"authorization", b"bearer secret")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertIn((b"x-api-key", b"secret"), result)
+
+    def test_existing_api_key_is_kept(self):
+        """Test that an existing X-API-Key is not overridden"""
+        # Setup
+        headers = [(b"authorization", b"Bearer other"), (b"x-api-key", b"mine")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertEqual(
+            result,
+            [(b"authorization", b"Bearer other"), (b"x-api-key", b"mine")],
+        )
+
+    def test_non_bearer_auth_is_ignored(self):
+        """Test that non-bearer Authorization headers add nothing"""
+        # Setup
+        headers = [(b"authorization", b"Basic dXNlcjpwYXNz")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertEqual(result, [(b"authorization", b"Basic dXNlcjpwYXNz")])
+
+    def test_empty_token_is_ignored(self):
+        """Test that a bearer header without a token adds nothing"""
+        # Setup
+        headers = [(b"authorization", b"Bearer   ")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertEqual(result, [(b"authorization", b"Bearer   ")])
+
+    def test_no_authorization_header(self):
+        """Test that requests without credentials pass through unchanged"""
+        # Setup
+        headers = [(b"accept", b"*/*")]
+
+        # Run function
+        result = apply_api_key_fallback(headers)
+
+        # Check results
+        self.assertEqual(result, [(b"accept", b"*/*")])
+
+
+class TestDeployInfoBody(unittest.TestCase):
+    """Tests for the mtime-keyed /status body cache"""
+
+    def setUp(self):
+        mcp_gateway._deploy_cache = None
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "deployed.json"
+
+    def tearDown(self):
+        mcp_gateway._deploy_cache = None
+        self.tmpdir.cleanup()
+
+    def _write(self, text, mtime_ns):
+        """Write the metadata file and pin its mtime"""
+        self.path.write_text(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reads_metadata(self):
+        """Test that the file contents are served as JSON"""
+        # Setup
+        self._write('{"commit": "abc123"}', 1_000_000_000)
+
+        # Run function
+        result = mcp_gateway._deploy_info_body(self.path)
+
+        # Check results
+        self.assertEqual(json.loads(result), {"commit": "abc123"})
+
+    def test_cache_hit_when_mtime_unchanged(self):
+        """Test that the file is not re-parsed while its mtime is unchanged"""
+        # Setup
+        self._write('{"commit": "abc123"}', 1_000_000_000)
+        mcp_gateway._deploy_info_body(self.path)
+        self._write('{"commit": "def456"}', 1_000_000_000)
+
+        # Run function
+        result = mcp_gateway._deploy_info_body(self.path)
+
+        # Check results
+        self.assertEqual(json.loads(result), {"commit": "abc123"})
+
+    def test_cache_invalidated_when_mtime_changes(self):
+        """Test that a new mtime causes the file to be re-read"""
+        # Setup
+        self._write('{"commit": "abc123"}', 1_000_000_000)
+        mcp_gateway._deploy_info_body(self.path)
+        self._write('{"commit": "def456"}', 2_000_000_000)
+
+        # Run function
+        result = mcp_gateway._deploy_info_body(self.path)
+
+        # Check results
+        self.assertEqual(json.loads(result), {"commit": "def456"})
+
+    def test_missing_file(self):
+        """Test that a missing file reports unknown status"""
+        # Run function
+        result = mcp_gateway._deploy_info_body(self.path)
+
+        # Check results
+        self.assertEqual(
+            json.loads(result),
+            {"status": "unknown", "message": "deploy metadata not found"},
+        )
+
+    def test_bad_json_is_reported_and_not_cached(self):
+        """Test that invalid JSON reports an error and is retried on next call"""
+        # Setup
+        self._write("{not json", 1_000_000_000)
+
+        # Run function
+        result = mcp_gateway._deploy_info_body(self.path)
+
+        # Check results
+        info = json.loads(result)
+        self.assertEqual(info["status"], "error")
+        self.assertIn("failed reading deploy metadata", info["message"])
+        self.assertIsNone(mcp_gateway._deploy_cache)
+
+        # Fixing the file without touching the mtime is picked up
+        self._write('{"commit": "abc123"}', 1_000_000_000)
+        result = mcp_gateway._deploy_info_body(self.path)
+        self.assertEqual(json.loads(result), {"commit": "abc123"})
+
+
+class TestProxy(unittest.IsolatedAsyncioTestCase):
+    """Round-trip tests for the proxy route against a mocked upstream"""
+
+    async def asyncSetUp(self):
+        self.upstream_requests = []
+
+        async def upstream(request):
+            if request.method == "HEAD":
+                return httpx.Response(200)
+            body = await request.aread()
+            self.upstream_requests.append((request, body))
+            # An unread stream, like a real network response, for aiter_raw().
+            return httpx.Response(
+                200,
+                headers=[
+                    ("content-type", "application/json"),
+                    ("vary", "Accept"),
+                    ("vary", "Origin"),
+                    ("connection", "keep-alive"),
+                ],
+                stream=httpx.ByteStream(b'{"ok": true}'),
+            )
+
+        # Route the gateway's own AsyncClient through the mocked upstream.
+        client_factory = functools.partial(
+            httpx.AsyncClient, transport=httpx.MockTransport(upstream)
+        )
+        with patch.object(mcp_gateway.httpx, "AsyncClient", client_factory):
+            self.app = mcp_gateway.create_app(
+                "http://upstream", Path("/nonexistent/deployed.json")
+            )
+        self.lifespan = self.app.router.lifespan_context(self.app)
+        await self.lifespan.__aenter__()
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.app), base_url="http://gateway"
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.lifespan.__aexit__(None, None, None)
+
+    async def test_post_body_forwarded_and_method_logged(self):
+        """Test that a JSON-RPC POST is streamed upstream and its method logged"""
+        # Setup
+        payload = b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}'
+        stdout = io.StringIO()
+
+        # Run function
+        with contextlib.redirect_stdout(stdout):
+            response = await self.client.post(
+                "/messages/?session_id=abc",
+                content=payload,
+                headers={"Authorization": "Bearer secret"},
+            )
+
+        # Check results
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ok": True})
+        request, body = self.upstream_requests[0]
+        self.assertEqual(body, payload)
+        self.assertEqual(str(request.url), "http://upstream/messages/?session_id=abc")
+        self.assertEqual(request.headers["content-length"], str(len(payload)))
+        self.assertNotIn("transfer-encoding", request.headers)
+        self.assertEqual(request.headers["x-api-key"], "secret")
+        event = json.loads(stdout.getvalue().strip().splitlines()[-1])
+        self.assertEqual(event["jsonrpc_method"], "tools/list")
+
+    async def test_empty_post_sends_no_body(self):
+        """Test that an empty POST is not turned into a chunked upload"""
+        # Run function
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = await self.client.post("/messages/", content=b"")
+
+        # Check results
+        self.assertEqual(response.status_code, 200)
+        request, body = self.upstream_requests[0]
+        self.assertEqual(body, b"")
+        self.assertNotIn("transfer-encoding", request.headers)
+
+
+    async def test_response_headers_keep_duplicates_and_drop_hop_by_hop(self):
+        """Test that repeated upstream headers survive and hop-by-hop ones do not"""
+        # Run function
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = await self.client.get("/sse")
+
+        # Check results
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["vary"], "Accept, Origin")
+        self.assertNotIn("connection", response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()